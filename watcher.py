@@ -1,149 +1,528 @@
 #!/usr/bin/env python3
 import os
+import sys
 import time
-import json
+import signal
+import queue
+import threading
+import msgspec
 import requests
-from collections import deque
-from datetime import datetime
+from array import array
+from collections import defaultdict
+from inotify_simple import INotify, flags
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Configuration from environment variables
 SLACK_WEBHOOK_URL = os.getenv('SLACK_WEBHOOK_URL')
 ERROR_RATE_THRESHOLD = float(os.getenv('ERROR_RATE_THRESHOLD', 2.0))
 WINDOW_SIZE = int(os.getenv('WINDOW_SIZE', 200))
 ALERT_COOLDOWN_SEC = int(os.getenv('ALERT_COOLDOWN_SEC', 300))
+ERROR_COUNT_LIMIT = ERROR_RATE_THRESHOLD * WINDOW_SIZE  # Threshold as error_count * 100
+READ_CHUNK_SIZE = 64 * 1024  # Bytes read from the log per syscall
+ALERT_BATCH_SEC = 2  # Repeats of the same alert within this window are merged
+STATE_FILE = os.getenv('STATE_FILE')  # Where the read offset is saved (unset = off)
+STATE_SAVE_SEC = 5  # How often the read offset is saved
+STATUS_INTERVAL = 50  # Requests between status log lines
+
+# Static parts of every Slack message; only "text" is filled in per alert
+SLACK_PAYLOAD_TEMPLATE = {
+    "username": "Blue/Green Monitor",
+    "icon_emoji": ":warning:"
+}
+SLACK_ALERT_HEADER = "🚨 *Blue/Green Alert*\n"
 
 # State tracking
 last_pool = None  # Start with None to detect first pool
-error_window = deque(maxlen=WINDOW_SIZE)
+error_window = array('b', bytes(WINDOW_SIZE))  # Ring buffer of 0/1 error flags
+window_index = 0  # Slot the next request is written to
+window_filled = 0  # Number of requests currently in error_window
+error_count = 0  # Number of errors currently in error_window
 last_alert_time = {}  # Separate cooldowns per alert type
 failover_count = 0
+request_count = 0  # Requests seen since startup
+status_logged_at = 0  # request_count when the last status line was logged
+cached_second = None  # Second for which cached_timestamp was formatted
+cached_timestamp = ''
+read_buffer = bytearray(READ_CHUNK_SIZE)  # Reused by every log read
+read_view = memoryview(read_buffer)
+log_offset = 0  # File offset just past the last processed log line
 
-def send_slack_alert(message, alert_type='default'):
-    """Send alert to Slack with per-type cooldown"""
-    global last_alert_time
+class LogRecord(msgspec.Struct):
+    """The access log fields the watcher uses (see log_format in nginx.conf)"""
+    pool: str = 'unknown'
+    upstream_status: str = ''
+    upstream_addr: str = ''
+    status: str = ''
+    time: str = ''
+
+log_decoder = msgspec.json.Decoder(LogRecord)
+
+# Slack delivery: one pooled keep-alive session, fed from a queue by a
+# background thread so a slow webhook never stalls the tail loop
+slack_session = requests.Session()
+slack_session.mount('https://', HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=2,
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset(['POST']),
+        raise_on_status=False
+    )
+))
+alert_queue = queue.Queue(maxsize=64)  # Bounded so a dead webhook can't grow memory
+
+def now_str():
+    """Current local time in ISO 8601, formatted at most once per second"""
+    global cached_second, cached_timestamp
     
-    # Check cooldown for this alert type
-    current_time = time.time()
-    last_time = last_alert_time.get(alert_type, 0)
+    second = int(time.time())
+    if second != cached_second:
+        cached_second = second
+        cached_timestamp = time.strftime('%Y-%m-%dT%H:%M:%S%z', time.localtime(second))
+    return cached_timestamp
+
+def can_send_alert(alert_type, now=None):
+    """Check whether the cooldown for this alert type has expired
     
-    if current_time - last_time < ALERT_COOLDOWN_SEC:
-        print(f"Alert suppressed (cooldown): {message}")
+    Cooldowns use time.monotonic() so wall clock jumps can't extend or
+    cut them short; pass now to reuse a reading the caller already took.
+    """
+    last_time = last_alert_time.get(alert_type)
+    if last_time is None:
+        return True
+    if now is None:
+        now = time.monotonic()
+    return now - last_time >= ALERT_COOLDOWN_SEC
+
+def send_slack_alert(message, alert_type='default', now=None):
+    """Queue an alert for Slack and start its type's cooldown
+    
+    Callers check can_send_alert() first (SlackAlertManager.flush does).
+    """
+    global last_alert_time
+    
+    if not SLACK_WEBHOOK_URL:
         return False
     
-    payload = {
-        "text": f"🚨 *Blue/Green Alert*\n{message}",
-        "username": "Blue/Green Monitor",
-        "icon_emoji": ":warning:"
-    }
+    if now is None:
+        now = time.monotonic()
     
+    # Only the message is queued; slack_sender() builds the payload
     try:
-        response = requests.post(SLACK_WEBHOOK_URL, json=payload)
-        if response.status_code == 200:
-            print(f"✅ Alert sent: {message}")
-            last_alert_time[alert_type] = current_time
-            return True
-        else:
-            print(f"❌ Failed to send alert: {response.status_code}")
-            return False
-    except Exception as e:
-        print(f"❌ Error sending to Slack: {e}")
+        alert_queue.put_nowait(message)
+    except queue.Full:
+        print(f"❌ Alert queue full, not queued: {message}")
         return False
+    
+    # Start the cooldown now rather than on delivery, otherwise a burst
+    # would queue up many alerts of the same type before the first is sent
+    last_alert_time[alert_type] = now
+    return True
+
+def slack_sender():
+    """Deliver queued alerts to Slack (runs in a background thread)"""
+    while True:
+        message = alert_queue.get()
+        payload = dict(SLACK_PAYLOAD_TEMPLATE, text=SLACK_ALERT_HEADER + message)
+        try:
+            response = slack_session.post(SLACK_WEBHOOK_URL, json=payload, timeout=5)
+            if response.status_code == 200:
+                print(f"✅ Alert sent: {message}")
+            else:
+                print(f"❌ Failed to send alert: {response.status_code}")
+        except Exception as e:
+            print(f"❌ Error sending to Slack: {e}")
+
+class SlackAlertManager:
+    """Collect alerts and send each burst of the same alert as one message
+    
+    Alerts that arrive while their type is in cooldown are held rather than
+    dropped, and go out as a single summary once the cooldown expires.
+    """
+    
+    def __init__(self, flush_interval=ALERT_BATCH_SEC):
+        self.flush_interval = flush_interval
+        # (alert_type, pool, addr) -> [count, first_seen, format_message, args]
+        self.pending = {}
+        self.lock = threading.Lock()
+    
+    def record(self, key, format_message, *args):
+        """Queue an alert; key is (alert_type, pool, addr) of its root cause
+        
+        The message is only built, via format_message(*args), if the alert
+        is actually sent, so repeats and suppressed alerts stay cheap.
+        Repeats only bump a counter and replace the arguments with the
+        latest ones.
+        """
+        # Without a webhook nothing can ever be sent, so don't hold anything
+        if not SLACK_WEBHOOK_URL:
+            return
+        
+        with self.lock:
+            alert = self.pending.get(key)
+            if alert is None:
+                self.pending[key] = [1, time.monotonic(), format_message, args]
+            else:
+                alert[0] += 1
+                alert[2] = format_message
+                alert[3] = args
+    
+    def flush(self):
+        """Send one Slack message per alert type whose cooldown has expired"""
+        now = time.monotonic()
+        ready = defaultdict(list)
+        with self.lock:
+            for key in list(self.pending):
+                if can_send_alert(key[0], now):
+                    ready[key[0]].append((key, self.pending.pop(key)))
+        
+        for alert_type, alerts in ready.items():
+            messages = []
+            for _, (count, first_seen, format_message, args) in alerts:
+                message = format_message(*args)
+                if count > 1:
+                    message += f"\n• Triggered {count} times in the last {now - first_seen:.0f}s"
+                messages.append(message)
+            if not send_slack_alert("\n\n".join(messages), alert_type=alert_type, now=now):
+                # Not queued because the queue is full: keep the alerts
+                # pending so they are retried on the next flush
+                self.restore(alerts)
+    
+    def restore(self, alerts):
+        """Put unsent (key, alert) pairs back, merging with newer repeats"""
+        with self.lock:
+            for key, alert in alerts:
+                newer = self.pending.get(key)
+                if newer is None:
+                    self.pending[key] = alert
+                else:
+                    # Keep the newer arguments but the older first_seen
+                    newer[0] += alert[0]
+                    newer[1] = alert[1]
+    
+    def run(self):
+        """Flush pending alerts periodically (runs in a background thread)"""
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+alert_manager = SlackAlertManager()
 
-def detect_failover(log_data):
+def detect_failover(record):
     """Detect failover by checking upstream_status and upstream_addr patterns"""
-    upstream_status = log_data.get('upstream_status', '')
-    upstream_addr = log_data.get('upstream_addr', '')
+    upstream_status = record.upstream_status
+    upstream_addr = record.upstream_addr
     
     # Failover detected if:
-    # 1. Multiple upstream addresses (tried multiple servers)
-    # 2. Multiple statuses with first one being an error
-    if ',' in upstream_addr and ',' in upstream_status:
-        statuses = [s.strip() for s in upstream_status.split(',')]
-        addrs = [a.strip() for a in upstream_addr.split(',')]
-        
-        # Check if first attempt failed (5xx or timeout)
-        if statuses[0].startswith('5') or statuses[0] == '':
-            return True, addrs[0], addrs[-1]
+    # 1. First attempt failed (5xx, or no status at all on timeout)
+    # 2. Multiple statuses and upstream addresses (tried multiple servers)
+    # Checked cheapest first; the strings are only split once it's a failover
+    first_status = upstream_status[:1]
+    if (first_status == '5' or first_status == ',') and ',' in upstream_status and ',' in upstream_addr:
+        addrs = upstream_addr.split(',')
+        return True, addrs[0].strip(), addrs[-1].strip()
     
     return False, None, None
 
+def record_request(is_error):
+    """Add a request to the error window, keeping error_count in step"""
+    global window_index, window_filled, error_count, request_count
+    
+    request_count += 1
+    
+    # Overwrite the oldest slot (always 0 until the window has filled)
+    error_count += is_error - error_window[window_index]
+    error_window[window_index] = is_error
+    window_index = (window_index + 1) % WINDOW_SIZE
+    if window_filled < WINDOW_SIZE:
+        window_filled += 1
+
+def reset_error_window():
+    """Forget all requests in the error window"""
+    global window_index, window_filled, error_count
+    error_window[:] = array('b', bytes(WINDOW_SIZE))
+    window_index = 0
+    window_filled = 0
+    error_count = 0
+
+def format_failover_alert(count, timestamp, primary_addr, backup_addr, pool, statuses):
+    """Build the Slack message for a failover"""
+    return (
+        f"🔄 *Failover Detected* (#{count})\n"
+        f"• Time: {timestamp}\n"
+        f"• Primary failed: {primary_addr}\n"
+        f"• Backup used: {backup_addr}\n"
+        f"• Pool: {pool}\n"
+        f"• Statuses: {statuses}"
+    )
+
+def format_pool_change_alert(old_pool, new_pool, timestamp, failovers):
+    """Build the Slack message for a pool change"""
+    return (
+        f"🔀 *Pool Change Detected*\n"
+        f"• Changed: {old_pool} → {new_pool}\n"
+        f"• Time: {timestamp}\n"
+        f"• Total failovers so far: {failovers}"
+    )
+
+def format_error_rate_alert(error_rate, pool):
+    """Build the Slack message for a high error rate"""
+    return (
+        f"⚠️ *High Error Rate*\n"
+        f"• Error rate: {error_rate:.1f}% (threshold: {ERROR_RATE_THRESHOLD}%)\n"
+        f"• Window: Last {WINDOW_SIZE} requests\n"
+        f"• Current pool: {pool}"
+    )
+
+def update_error_window(record):
+    """Track errors for rate calculation (5xx from nginx or any upstream try)"""
+    record_request(1 if record.upstream_status[:1] == '5' or record.status[:1] == '5' else 0)
+
+def check_failover(record, timestamp):
+    """Alert if the request had to be retried on another upstream"""
+    global failover_count
+    
+    is_failover, primary_addr, backup_addr = detect_failover(record)
+    
+    if is_failover:
+        failover_count += 1
+        alert_manager.record(
+            ('failover', record.pool, primary_addr), format_failover_alert,
+            failover_count, timestamp, primary_addr, backup_addr, record.pool, record.upstream_status
+        )
+        print(f"🔄 Failover #{failover_count}: {primary_addr} → {backup_addr}")
+
+def check_pool_change(record, timestamp):
+    """Alert if the request was served by a different pool than the last one"""
+    global last_pool
+    
+    pool = record.pool
+    
+    # Initialize last_pool if first log
+    if last_pool is None:
+        last_pool = pool
+        print(f"📊 Initial pool detected: {pool}")
+    
+    if pool != 'unknown' and pool != last_pool:
+        alert_manager.record(
+            ('pool_change', pool, None), format_pool_change_alert,
+            last_pool, pool, timestamp, failover_count
+        )
+        print(f"🔀 Pool changed: {last_pool} → {pool}")
+        last_pool = pool
+
+def check_error_rate(record):
+    """Alert if the error rate over a full window is above the threshold"""
+    # error_count / WINDOW_SIZE * 100 > threshold, rearranged so no
+    # division is needed until an alert fires
+    if window_filled >= WINDOW_SIZE and error_count * 100 > ERROR_COUNT_LIMIT:
+        error_rate = (error_count / window_filled) * 100
+        alert_manager.record(
+            ('error_rate', record.pool, None), format_error_rate_alert, error_rate, record.pool
+        )
+        print(f"⚠️ High error rate: {error_rate:.1f}%")
+        # Clear window after alert to avoid spam
+        reset_error_window()
+
+def log_status():
+    """Log a status line if STATUS_INTERVAL requests have passed since the last"""
+    global status_logged_at
+    
+    if request_count - status_logged_at < STATUS_INTERVAL:
+        return
+    
+    status_logged_at = request_count
+    error_rate = (error_count / window_filled) * 100 if window_filled else 0.0
+    print(f"📈 Status: pool={last_pool}, error_rate={error_rate:.1f}%, failovers={failover_count}")
+
 def process_log_line(line):
     """Process a single log line and check for alerts"""
-    global last_pool, failover_count
+    # Access log entries are JSON objects; skip anything else (like nginx
+    # startup messages or blank lines) without paying for a decode error
+    if line[:1] != b'{':
+        return
     
     try:
-        log_data = json.loads(line)
-        
-        # Extract fields
-        pool = log_data.get('pool', 'unknown')
-        upstream_status = log_data.get('upstream_status', '')
-        status = log_data.get('status', '')
-        timestamp = log_data.get('time', datetime.now().isoformat())
-        
-        # Initialize last_pool if first log
-        if last_pool is None:
-            last_pool = pool
-            print(f"📊 Initial pool detected: {pool}")
-        
-        # Track errors for rate calculation
-        is_error = upstream_status.startswith('5') or status.startswith('5')
-        error_window.append(1 if is_error else 0)
-        
-        # Check for failover pattern in upstream responses
-        is_failover, primary_addr, backup_addr = detect_failover(log_data)
-        
-        if is_failover:
-            failover_count += 1
-            message = (
-                f"🔄 *Failover Detected* (#{failover_count})\n"
-                f"• Time: {timestamp}\n"
-                f"• Primary failed: {primary_addr}\n"
-                f"• Backup used: {backup_addr}\n"
-                f"• Pool: {pool}\n"
-                f"• Statuses: {log_data.get('upstream_status')}"
-            )
-            send_slack_alert(message, alert_type='failover')
-            print(f"🔄 Failover #{failover_count}: {primary_addr} → {backup_addr}")
-        
-        # Check for pool change (different detection method)
-        if pool != 'unknown' and pool != last_pool:
-            message = (
-                f"🔀 *Pool Change Detected*\n"
-                f"• Changed: {last_pool} → {pool}\n"
-                f"• Time: {timestamp}\n"
-                f"• Total failovers so far: {failover_count}"
-            )
-            send_slack_alert(message, alert_type='pool_change')
-            print(f"🔀 Pool changed: {last_pool} → {pool}")
-            last_pool = pool
+        # Decode once into a struct; every check reads its fields directly
+        record = log_decoder.decode(line)
+        timestamp = record.time or now_str()
         
-        # Check error rate
-        if len(error_window) >= WINDOW_SIZE:
-            error_rate = (sum(error_window) / len(error_window)) * 100
-            if error_rate > ERROR_RATE_THRESHOLD:
-                message = (
-                    f"⚠️ *High Error Rate*\n"
-                    f"• Error rate: {error_rate:.1f}% (threshold: {ERROR_RATE_THRESHOLD}%)\n"
-                    f"• Window: Last {WINDOW_SIZE} requests\n"
-                    f"• Current pool: {pool}"
-                )
-                send_slack_alert(message, alert_type='error_rate')
-                print(f"⚠️ High error rate: {error_rate:.1f}%")
-                # Clear window after alert to avoid spam
-                error_window.clear()
-        
-        # Log status periodically (every 50 requests)
-        if len(error_window) % 50 == 0 and len(error_window) > 0:
-            error_rate = (sum(error_window) / len(error_window)) * 100
-            print(f"📈 Status: pool={pool}, error_rate={error_rate:.1f}%, failovers={failover_count}")
+        update_error_window(record)
+        check_failover(record, timestamp)
+        check_pool_change(record, timestamp)
+        check_error_rate(record)
                 
-    except json.JSONDecodeError:
-        # Skip non-JSON lines (like nginx startup messages)
+    except msgspec.DecodeError:
+        # Skip malformed or truncated JSON lines
         pass
     except Exception as e:
         print(f"❌ Error processing log: {e}")
         print(f"   Line: {line[:100]}...")
 
+def open_log_file(log_file_path):
+    """Open the log for reading, hinting the kernel that access is sequential"""
+    fd = os.open(log_file_path, os.O_RDONLY)
+    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    return fd
+
+def drain_log_file(fd, partial=b''):
+    """Process every complete line currently available in the log file
+    
+    Reads raw bytes in large chunks up to EOF into a reused buffer and
+    returns the trailing incomplete line (if any) so it can be finished
+    on the next wakeup. log_offset is advanced after every processed line.
+    """
+    global log_offset
+    
+    while True:
+        size = os.readv(fd, [read_buffer])
+        if not size:
+            return partial
+        
+        # File offset of read_buffer[0]; partial starts at log_offset
+        base = log_offset + len(partial)
+        
+        # Scan the buffer in place; only a line split across reads is joined
+        start = 0
+        end = read_buffer.find(b'\n', 0, size)
+        if end != -1 and partial:
+            process_log_line(partial + read_view[:end])
+            log_offset = base + end + 1
+            partial = b''
+            start = end + 1
+            end = read_buffer.find(b'\n', start, size)
+        while end != -1:
+            process_log_line(bytes(read_view[start:end]))
+            log_offset = base + end + 1
+            start = end + 1
+            end = read_buffer.find(b'\n', start, size)
+        partial += read_view[start:size]
+
+def file_identity(stat_result):
+    """Identify a file by device and inode, which survive renames"""
+    return (stat_result.st_dev, stat_result.st_ino)
+
+def load_offset(identity):
+    """Return the saved read offset if it belongs to this log file"""
+    if not STATE_FILE:
+        return None
+    
+    try:
+        with open(STATE_FILE, 'rb') as f:
+            state = msgspec.json.decode(f.read())
+        if (state['dev'], state['ino']) == identity:
+            return state['offset']
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"❌ Error loading state: {e}")
+    return None
+
+def save_offset(identity, offset):
+    """Persist the read offset so a restart resumes where it left off"""
+    dev, ino = identity
+    tmp_path = STATE_FILE + '.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(msgspec.json.encode({'dev': dev, 'ino': ino, 'offset': offset}))
+        os.replace(tmp_path, STATE_FILE)
+    except OSError as e:
+        print(f"❌ Error saving state: {e}")
+
+def wait_for_log_file(log_file_path):
+    """Open the log file, waiting for nginx to create it if necessary"""
+    while True:
+        try:
+            return open_log_file(log_file_path)
+        except FileNotFoundError:
+            print("⏳ Waiting for nginx log file...")
+            time.sleep(2)
+
+def tail_log_file(log_file_path, fd):
+    """Follow the already opened log file by name, blocking until inotify reports a change"""
+    global log_offset
+    
+    log_dir, log_name = os.path.split(log_file_path)
+    
+    # Watch the directory rather than the file so rotation (a new file
+    # created or moved into place under the same name) is also reported
+    inotify = INotify()
+    inotify.add_watch(log_dir, flags.MODIFY | flags.CREATE | flags.MOVED_TO)
+    
+    stat_result = os.fstat(fd)
+    identity = file_identity(stat_result)
+    
+    partial = b''
+    offset = load_offset(identity)
+    if offset is not None and offset <= stat_result.st_size:
+        log_offset = os.lseek(fd, offset, os.SEEK_SET)
+        print(f"⏩ Resuming at offset {offset}")
+        # Catch up on lines written while we were down; on a quiet log
+        # there may be no further inotify event to trigger this
+        partial = drain_log_file(fd)
+        log_status()
+    else:
+        # Go to end of file (start fresh, or use os.SEEK_SET to read from beginning)
+        log_offset = os.lseek(fd, 0, os.SEEK_END)
+    
+    last_saved = time.monotonic()
+    unsaved = offset is not None  # Lines processed since the last save
+    try:
+        while True:
+            # With lines left unsaved, wake up by the save deadline even if
+            # the log goes quiet so the offset on disk catches up
+            timeout = None
+            if unsaved:
+                timeout = max(0, last_saved + STATE_SAVE_SEC - time.monotonic()) * 1000
+            events = inotify.read(timeout=timeout)
+            
+            if any(event.name == log_name for event in events):
+                # Compare inodes rather than sizes: a rotated log can grow past
+                # the old offset before we notice, but its inode always differs
+                try:
+                    current_identity = file_identity(os.stat(log_file_path))
+                except FileNotFoundError:
+                    # Moved away and not recreated yet, keep reading the old file
+                    current_identity = identity
+                
+                if current_identity != identity:
+                    # Log was rotated: finish the old file, then follow the new one
+                    drain_log_file(fd, partial)
+                    os.close(fd)
+                    fd = None  # Not ours to close if we exit while waiting
+                    new_fd = wait_for_log_file(log_file_path)
+                    identity = file_identity(os.fstat(new_fd))
+                    log_offset = 0
+                    fd = new_fd
+                    partial = b''
+                    print(f"🔁 Log file rotated, reopened: {log_file_path}")
+                elif os.fstat(fd).st_size < os.lseek(fd, 0, os.SEEK_CUR):
+                    # Truncated in place (copytruncate): start again from the top
+                    log_offset = os.lseek(fd, 0, os.SEEK_SET)
+                    partial = b''
+                    print(f"✂️ Log file truncated, rewound: {log_file_path}")
+                
+                partial = drain_log_file(fd, partial)
+                log_status()
+                unsaved = bool(STATE_FILE)
+            
+            # Checked on every wakeup: events for other files in the
+            # directory must not keep pushing the save back
+            if unsaved:
+                now = time.monotonic()
+                if now - last_saved >= STATE_SAVE_SEC:
+                    save_offset(identity, log_offset)
+                    last_saved = now
+                    unsaved = False
+    finally:
+        if STATE_FILE:
+            save_offset(identity, log_offset)
+        if fd is not None:
+            os.close(fd)
+
 def main():
     """Main loop to watch nginx logs"""
     log_file = "/var/log/nginx/access.log"
@@ -156,27 +535,21 @@ def main():
     print(f"   • Window size: {WINDOW_SIZE} requests")
     print(f"   • Alert cooldown: {ALERT_COOLDOWN_SEC}s")
     print(f"   • Slack webhook: {'✅ Configured' if SLACK_WEBHOOK_URL else '❌ Not configured'}")
+    print(f"   • Offset state file: {STATE_FILE or '❌ Not configured'}")
     print("=" * 60)
     
-    # Wait for log file to exist
-    while not os.path.exists(log_file):
-        print("⏳ Waiting for nginx log file...")
-        time.sleep(2)
+    # docker stop sends SIGTERM; exit normally so the read offset is saved
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    
+    threading.Thread(target=slack_sender, daemon=True).start()
+    threading.Thread(target=alert_manager.run, daemon=True).start()
+    
+    fd = wait_for_log_file(log_file)
     
     print(f"✅ Log file found: {log_file}")
     print("👀 Watching for events...\n")
     
-    # Tail the log file
-    with open(log_file, 'r') as file:
-        # Go to end of file (start fresh, or use file.seek(0, 0) to read from beginning)
-        file.seek(0, 2)
-        
-        while True:
-            line = file.readline()
-            if line:
-                process_log_line(line.strip())
-            else:
-                time.sleep(0.1)
+    tail_log_file(log_file, fd)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file